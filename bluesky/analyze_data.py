@@ -1,43 +1,173 @@
+import os
+import numpy as np
 import pandas as pd
-import json
+import pyarrow.parquet as pq
+import orjson
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import Counter
 
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
+plt.ioff()
+
+
+# Label value -> integer code, shared by every parsed row; _label_names is the reverse map.
+_label_vocab = {}
+_label_names = []
+
+
+def _intern_label(value):
+    code = _label_vocab.get(value)
+    if code is None:
+        code = _label_vocab[value] = len(_label_names)
+        _label_names.append(value)
+    return code
+
+
+def _fast_parse(s):
+    """Parse a serialized moderation_labels cell into an array of interned label codes.
+    
+    The collector writes every label as a dict with a str 'value', so no per-label checks are made.
+    """
+    if not s or s == '[]':
+        return np.empty(0, dtype=np.int32)
+    return np.array([_intern_label(label['value']) for label in orjson.loads(s)], dtype=np.int32)
+
 
 class BlueskyDataAnalyzer:
-    def __init__(self, csv_file):
-        """Load and prepare the data."""
-        print(f"Loading data from {csv_file}...")
-        self.df = pd.read_csv(csv_file)
-        print(f"✓ Loaded {len(self.df)} posts\n")
-        
-        self.df['moderation_labels_parsed'] = self.df['moderation_labels'].apply(
-            lambda x: json.loads(x) if pd.notna(x) and x != '[]' else []
-        )
-        
+    ENGAGEMENT_METRICS = ['likes_count', 'repost_count', 'reply_count']
+    # Upper (inclusive) edges of every follower bucket but the last; counts <= 0 fall in no bucket.
+    FOLLOWER_EDGES = np.array([100, 1000, 10000], dtype=np.int32)
+    FOLLOWER_LABELS = ['<100', '100-1K', '1K-10K', '>10K']
+    SAMPLE_SIZE = 5
+    COLUMN_DTYPES = {
+        'search_term': 'string[pyarrow]',
+        'author_handle': 'string[pyarrow]',
+        'post_text': 'string[pyarrow]',
+        'author_followers': 'int32',
+        'likes_count': 'int32',
+        'repost_count': 'int32',
+        'reply_count': 'int32',
+        'has_moderation': 'bool',
+    }
+
+    def __init__(self, data_file, chunksize=200_000):
+        """Stream the data (.parquet or .csv) in chunks and accumulate the aggregates each analysis needs."""
+        print(f"Loading data from {data_file}...")
+        self.total_posts = 0
+        self._authors = set()
+        self._search_terms = set()
+        self._label_code_counts = np.zeros(0, dtype=np.int64)
+        term_follower_parts = []
+        engagement_parts = []
+        sample_parts = []
+        sampled = 0
+        
+        for chunk in self._read_chunks(data_file, chunksize):
+            chunk.rename(columns={'moderation_labels': 'moderation_labels_parsed'}, inplace=True)
+            followers = chunk['author_followers'].to_numpy()
+            buckets = np.searchsorted(self.FOLLOWER_EDGES, followers)
+            buckets[followers <= 0] = -1
+            chunk['follower_category'] = pd.Categorical.from_codes(
+                buckets, categories=self.FOLLOWER_LABELS, ordered=True
+            )
+            
+            self.total_posts += len(chunk)
+            self._authors.update(chunk['author_handle'].dropna().unique())
+            self._search_terms.update(chunk['search_term'].dropna().unique())
+            
+            codes = np.concatenate(chunk['moderation_labels_parsed'].to_numpy())
+            chunk_counts = np.bincount(codes, minlength=len(_label_names))
+            chunk_counts[:len(self._label_code_counts)] += self._label_code_counts
+            self._label_code_counts = chunk_counts
+            
+            term_follower_parts.append(chunk.groupby(
+                ['search_term', 'follower_category'], observed=True, dropna=False
+            )['has_moderation'].agg(['sum', 'count']))
+            
+            engagement_parts.append(
+                chunk.groupby('has_moderation')[self.ENGAGEMENT_METRICS].agg(['sum', 'count'])
+            )
+            
+            if sampled < self.SAMPLE_SIZE:
+                moderated = chunk[chunk['has_moderation']].head(self.SAMPLE_SIZE - sampled)
+                sample_parts.append(moderated)
+                sampled += len(moderated)
+        
+        self._moderation_counts = self._combine(term_follower_parts, level=[0, 1])
+        self._engagement = self._combine(engagement_parts, level=0)
+        self._sample_moderated = pd.concat(sample_parts) if sample_parts else pd.DataFrame()
+        # Unrounded moderation rates, filled in by the analyze_by_* methods for the summary report.
+        self._term_rate = None
+        self._follower_rate = None
+        self._fig = None
+        print(f"✓ Loaded {self.total_posts} posts\n")
+    
+    def _read_chunks(self, data_file, chunksize):
+        """Yield DataFrames of the needed columns with moderation_labels already parsed."""
+        columns = [*self.COLUMN_DTYPES, 'moderation_labels']
+        if not data_file.endswith('.parquet'):
+            yield from pd.read_csv(
+                data_file,
+                chunksize=chunksize,
+                usecols=columns,
+                dtype=self.COLUMN_DTYPES,
+                converters={'moderation_labels': _fast_parse}
+            )
+            return
+        
+        offset = 0
+        for batch in pq.ParquetFile(data_file).iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas().astype(self.COLUMN_DTYPES)
+            chunk['moderation_labels'] = chunk['moderation_labels'].map(_fast_parse)
+            # Match the running index read_csv gives across chunks.
+            chunk.index += offset
+            offset += len(chunk)
+            yield chunk
+    
+    @staticmethod
+    def _combine(parts, level):
+        """Sum per-chunk partial aggregates into a single table."""
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts).groupby(level=level, observed=True, dropna=False).sum()
+    
+    @staticmethod
+    def _rate_table(counts, rate):
+        """Turn summed (sum, count) pairs and their rate into a Moderated/Total/Rate table."""
+        table = counts.rename(columns={'sum': 'Moderated', 'count': 'Total'})
+        table['Rate'] = rate.round(4) * 100
+        return table
+    
+    def _reset_figure(self):
+        """Select and clear the one figure every chart is drawn on."""
+        if self._fig is None:
+            self._fig = plt.figure(figsize=(10, 6))
+        plt.figure(self._fig.number)
+        plt.clf()
+    
     def basic_statistics(self):
         """Calculate and display basic statistics."""
         print("=" * 70)
         print("BASIC STATISTICS")
         print("=" * 70)
         
-        total_posts = len(self.df)
-        moderated_posts = self.df['has_moderation'].sum()
+        engagement = self._engagement.sum()
+        total_posts = self.total_posts
+        moderated_posts = int(self._moderation_counts['sum'].sum())
         moderation_rate = (moderated_posts / total_posts) * 100
         
         print(f"Total posts collected: {total_posts}")
         print(f"Posts with moderation labels: {moderated_posts}")
         print(f"Overall moderation rate: {moderation_rate:.2f}%")
-        print(f"\nUnique authors: {self.df['author_handle'].nunique()}")
-        print(f"Search terms used: {self.df['search_term'].nunique()}")
+        print(f"\nUnique authors: {len(self._authors)}")
+        print(f"Search terms used: {len(self._search_terms)}")
         
         print(f"\nEngagement Metrics (Average):")
-        print(f"  Likes: {self.df['likes_count'].mean():.1f}")
-        print(f"  Reposts: {self.df['repost_count'].mean():.1f}")
-        print(f"  Replies: {self.df['reply_count'].mean():.1f}")
+        for name, metric in zip(['Likes', 'Reposts', 'Replies'], self.ENGAGEMENT_METRICS):
+            print(f"  {name}: {engagement[(metric, 'sum')] / engagement[(metric, 'count')]:.1f}")
         
         return {
             'total_posts': total_posts,
@@ -51,26 +181,23 @@ class BlueskyDataAnalyzer:
         print("MODERATION BY SEARCH TERM")
         print("=" * 70)
         
-        term_analysis = self.df.groupby('search_term').agg({
-            'has_moderation': ['sum', 'count', 'mean']
-        }).round(4)
-        
-        term_analysis.columns = ['Moderated', 'Total', 'Rate']
-        term_analysis['Rate'] = term_analysis['Rate'] * 100
+        counts = self._moderation_counts
+        totals = counts.groupby(level='search_term').sum()
+        self._term_rate = totals['sum'] / totals['count']
+        term_analysis = self._rate_table(totals, self._term_rate)
         term_analysis = term_analysis.sort_values('Rate', ascending=False)
         
         print(term_analysis.to_string())
         
-        plt.figure(figsize=(10, 6))
-        plt.bar(range(len(term_analysis)), term_analysis['Rate'])
+        self._reset_figure()
+        plt.bar(range(len(term_analysis)), term_analysis['Rate'], rasterized=True)
         plt.xlabel('Search Term')
         plt.ylabel('Moderation Rate (%)')
         plt.title('Moderation Rate by Search Term')
         plt.xticks(range(len(term_analysis)), term_analysis.index, rotation=45, ha='right')
         plt.tight_layout()
-        plt.savefig('moderation_by_term.png', dpi=300, bbox_inches='tight')
+        plt.savefig('moderation_by_term.png', dpi=150, bbox_inches='tight')
         print("\n✓ Saved chart: moderation_by_term.png")
-        plt.close()
         
         return term_analysis
     
@@ -80,33 +207,22 @@ class BlueskyDataAnalyzer:
         print("MODERATION BY FOLLOWER COUNT")
         print("=" * 70)
         
-        bins = [0, 100, 1000, 10000, float('inf')]
-        labels = ['<100', '100-1K', '1K-10K', '>10K']
-        self.df['follower_category'] = pd.cut(
-            self.df['author_followers'], 
-            bins=bins, 
-            labels=labels
-        )
-        
-        follower_analysis = self.df.groupby('follower_category').agg({
-            'has_moderation': ['sum', 'count', 'mean']
-        }).round(4)
-        
-        follower_analysis.columns = ['Moderated', 'Total', 'Rate']
-        follower_analysis['Rate'] = follower_analysis['Rate'] * 100
+        counts = self._moderation_counts
+        totals = counts.groupby(level='follower_category', observed=True).sum()
+        self._follower_rate = totals['sum'] / totals['count']
+        follower_analysis = self._rate_table(totals, self._follower_rate)
         
         print(follower_analysis.to_string())
         
-        plt.figure(figsize=(10, 6))
-        plt.bar(range(len(follower_analysis)), follower_analysis['Rate'])
+        self._reset_figure()
+        plt.bar(range(len(follower_analysis)), follower_analysis['Rate'], rasterized=True)
         plt.xlabel('Follower Count Category')
         plt.ylabel('Moderation Rate (%)')
         plt.title('Moderation Rate by Account Size')
         plt.xticks(range(len(follower_analysis)), follower_analysis.index)
         plt.tight_layout()
-        plt.savefig('moderation_by_followers.png', dpi=300, bbox_inches='tight')
+        plt.savefig('moderation_by_followers.png', dpi=150, bbox_inches='tight')
         print("\n✓ Saved chart: moderation_by_followers.png")
-        plt.close()
         
         return follower_analysis
     
@@ -116,35 +232,34 @@ class BlueskyDataAnalyzer:
         print("MODERATION LABEL TYPES")
         print("=" * 70)
         
-        all_labels = []
-        for labels_list in self.df['moderation_labels_parsed']:
-            for label in labels_list:
-                if isinstance(label, dict) and 'value' in label:
-                    all_labels.append(label['value'])
+        counts = self._label_code_counts
+        present = np.flatnonzero(counts)
         
-        if not all_labels:
+        if not len(present):
             print("No moderation labels found in dataset.")
             return None
         
-        label_counts = Counter(all_labels)
+        # Stable sort keeps first-seen order among equal counts, like Counter.most_common.
+        order = present[np.argsort(-counts[present], kind='stable')]
+        label_counts = pd.Series(
+            counts[order], index=[_label_names[code] for code in order], name='count'
+        )
         
-        print(f"Total labels applied: {len(all_labels)}")
+        print(f"Total labels applied: {counts.sum()}")
         print(f"Unique label types: {len(label_counts)}\n")
         print("Label Distribution:")
-        for label, count in label_counts.most_common():
+        for label, count in label_counts.items():
             print(f"  {label}: {count}")
         
-        if label_counts:
-            plt.figure(figsize=(10, 6))
-            labels, counts = zip(*label_counts.most_common(10))
-            plt.barh(range(len(labels)), counts)
-            plt.yticks(range(len(labels)), labels)
-            plt.xlabel('Count')
-            plt.title('Most Common Moderation Labels')
-            plt.tight_layout()
-            plt.savefig('moderation_label_types.png', dpi=300, bbox_inches='tight')
-            print("\n✓ Saved chart: moderation_label_types.png")
-            plt.close()
+        top = label_counts.iloc[:10]
+        self._reset_figure()
+        plt.barh(range(len(top)), top.to_numpy(), rasterized=True)
+        plt.yticks(range(len(top)), top.index)
+        plt.xlabel('Count')
+        plt.title('Most Common Moderation Labels')
+        plt.tight_layout()
+        plt.savefig('moderation_label_types.png', dpi=150, bbox_inches='tight')
+        print("\n✓ Saved chart: moderation_label_types.png")
         
         return label_counts
     
@@ -154,32 +269,33 @@ class BlueskyDataAnalyzer:
         print("ENGAGEMENT: MODERATED vs NON-MODERATED POSTS")
         print("=" * 70)
         
-        moderated = self.df[self.df['has_moderation'] == True]
-        non_moderated = self.df[self.df['has_moderation'] == False]
+        metrics = self.ENGAGEMENT_METRICS
+        engagement = self._engagement
         
-        if len(moderated) == 0:
+        if True not in engagement.index:
             print("No moderated posts to compare.")
             return None
         
-        metrics = ['likes_count', 'repost_count', 'reply_count']
-        
+        grp = pd.DataFrame({
+            m: engagement[(m, 'sum')] / engagement[(m, 'count')] for m in metrics
+        }).reindex([True, False])
         comparison = pd.DataFrame({
-            'Moderated': [moderated[m].mean() for m in metrics],
-            'Non-Moderated': [non_moderated[m].mean() for m in metrics]
+            'Moderated': grp.loc[True].to_numpy(),
+            'Non-Moderated': grp.loc[False].to_numpy()
         }, index=['Likes', 'Reposts', 'Replies'])
         
         print(comparison.round(2).to_string())
         
-        comparison.plot(kind='bar', figsize=(10, 6))
+        self._reset_figure()
+        comparison.plot(kind='bar', ax=plt.gca(), rasterized=True)
         plt.title('Average Engagement: Moderated vs Non-Moderated Posts')
         plt.ylabel('Average Count')
         plt.xlabel('Engagement Type')
         plt.xticks(rotation=0)
         plt.legend(title='Post Type')
         plt.tight_layout()
-        plt.savefig('engagement_comparison.png', dpi=300, bbox_inches='tight')
+        plt.savefig('engagement_comparison.png', dpi=150, bbox_inches='tight')
         print("\n✓ Saved chart: engagement_comparison.png")
-        plt.close()
         
         return comparison
     
@@ -189,7 +305,7 @@ class BlueskyDataAnalyzer:
         print("SAMPLE MODERATED POSTS")
         print("=" * 70)
         
-        moderated = self.df[self.df['has_moderation'] == True]
+        moderated = self._sample_moderated
         
         if len(moderated) == 0:
             print("No moderated posts found.")
@@ -197,14 +313,14 @@ class BlueskyDataAnalyzer:
         
         print(f"\nShowing up to 5 examples:\n")
         
-        for idx, row in moderated.head(5).iterrows():
+        for idx, row in moderated.iterrows():
             print(f"Post #{idx + 1}")
             print(f"  Author: {row['author_handle']} ({row['author_followers']} followers)")
             print(f"  Text: {row['post_text'][:100]}...")
             print(f"  Search term: {row['search_term']}")
             labels = row['moderation_labels_parsed']
-            if labels:
-                label_values = [l.get('value', 'unknown') for l in labels if isinstance(l, dict)]
+            if len(labels):
+                label_values = [_label_names[code] for code in labels]
                 print(f"  Labels: {', '.join(label_values)}")
             print(f"  Engagement: {row['likes_count']} likes, {row['repost_count']} reposts")
             print()
@@ -227,18 +343,17 @@ class BlueskyDataAnalyzer:
             f.write("KEY FINDINGS:\n")
             f.write("-" * 70 + "\n")
             
-            term_analysis = self.df.groupby('search_term')['has_moderation'].mean()
-            if len(term_analysis) > 0:
+            term_analysis = self._term_rate
+            if term_analysis is not None and len(term_analysis) > 0:
                 top_term = term_analysis.idxmax()
                 top_rate = term_analysis.max() * 100
                 f.write(f"1. Search term '{top_term}' had highest moderation rate ({top_rate:.2f}%)\n")
             
-            if 'follower_category' in self.df.columns:
-                follower_analysis = self.df.groupby('follower_category')['has_moderation'].mean()
-                if len(follower_analysis) > 0:
-                    f.write(f"2. Moderation rates by follower count:\n")
-                    for cat, rate in follower_analysis.items():
-                        f.write(f"   - {cat}: {rate*100:.2f}%\n")
+            follower_analysis = self._follower_rate
+            if follower_analysis is not None and len(follower_analysis) > 0:
+                f.write(f"2. Moderation rates by follower count:\n")
+                for cat, rate in follower_analysis.items():
+                    f.write(f"   - {cat}: {rate*100:.2f}%\n")
             
             f.write(f"\nGenerated: {pd.Timestamp.now()}\n")
         
@@ -252,7 +367,10 @@ def main():
     print("=" * 70)
     print()
     
-    analyzer = BlueskyDataAnalyzer('moderation_data.csv')
+    data_file = 'moderation_data.parquet'
+    if not os.path.exists(data_file):
+        data_file = 'moderation_data.csv'
+    analyzer = BlueskyDataAnalyzer(data_file)
     
     analyzer.basic_statistics()
     analyzer.analyze_by_search_term()
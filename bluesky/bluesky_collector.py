@@ -1,17 +1,42 @@
+import asyncio
+import aiohttp
 import requests
-import json
-import time
+import orjson
 from datetime import datetime
-import csv
 import os
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+POST_FIELDS = (
+    'timestamp', 'search_term', 'post_uri', 'post_text', 'author_handle',
+    'author_display_name', 'author_followers', 'author_following', 'author_posts',
+    'likes_count', 'repost_count', 'reply_count', 'has_moderation',
+    'moderation_labels', 'created_at'
+)
+
+USER_FIELDS = (
+    'handle', 'display_name', 'followers', 'following', 'total_posts',
+    'posts_analyzed', 'posts_with_moderation', 'moderation_rate',
+    'unique_labels', 'all_labels'
+)
 
 class BlueskyModerationCollector:
+    MAX_CONCURRENT_REQUESTS = 4
+    REQUEST_SPACING = 2
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
     def __init__(self, handle, password):
         """Initialize the Bluesky API collector with authentication."""
         self.base_url = "https://bsky.social/xrpc"
         self.handle = handle
         self.password = password
         self.session = None
+        self.auth_headers = {}
+        # Only used for authentication; API requests go through aiohttp (see _get_json_async)
+        self.http = requests.Session()
         self.authenticate()
     
     def authenticate(self):
@@ -23,70 +48,75 @@ class BlueskyModerationCollector:
         }
         
         try:
-            response = requests.post(url, json=data)
+            response = self.http.post(url, json=data)
             response.raise_for_status()
-            self.session = response.json()
+            self.session = orjson.loads(response.content)
+            self.auth_headers = {"Authorization": f"Bearer {self.session['accessJwt']}"}
             print(f"✓ Authenticated as {self.handle}")
             return True
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"✗ Authentication failed: {e}")
             return False
     
-    def get_headers(self):
-        """Return authorization headers for API requests."""
-        if not self.session:
-            raise Exception("Not authenticated")
-        return {
-            "Authorization": f"Bearer {self.session['accessJwt']}"
-        }
+    async def _get_json_async(self, session, sem, url, params, error_message):
+        """
+        GET a JSON endpoint, holding one of the rate-limit slots for REQUEST_SPACING seconds.
+        Responses in RETRY_STATUSES are retried up to MAX_RETRIES times, waiting for
+        Retry-After when given or an exponential backoff otherwise.
+        """
+        async with sem:
+            try:
+                for attempt in range(self.MAX_RETRIES + 1):
+                    async with session.get(url, params=params) as response:
+                        if response.status in self.RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                            delay = self._retry_delay(response.headers.get('Retry-After'), attempt)
+                        else:
+                            response.raise_for_status()
+                            return orjson.loads(await response.read())
+                    await asyncio.sleep(delay)
+            except (aiohttp.ClientError, orjson.JSONDecodeError) as e:
+                print(f"✗ {error_message}: {e}")
+                return None
+            finally:
+                await asyncio.sleep(self.REQUEST_SPACING)
     
-    def search_posts(self, query, limit=100):
-        """Search for posts containing specific terms."""
-        url = f"{self.base_url}/app.bsky.feed.searchPosts"
-        params = {
-            "q": query,
-            "limit": limit
-        }
-        
+    def _retry_delay(self, retry_after, attempt):
+        """Seconds to wait before retry number `attempt` + 1."""
         try:
-            response = requests.get(url, params=params, headers=self.get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Search failed: {e}")
-            return None
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return self.RETRY_BACKOFF * 2 ** attempt
     
-    def get_author_feed(self, actor, limit=50):
-        """Get posts from a specific user."""
-        url = f"{self.base_url}/app.bsky.feed.getAuthorFeed"
-        params = {
-            "actor": actor,
-            "limit": limit
-        }
-        
-        try:
-            response = requests.get(url, params=params, headers=self.get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Failed to get author feed: {e}")
-            return None
+    async def _search_all(self, search_terms, limit):
+        """Run every search concurrently and return results in search_terms order."""
+        url = f"{self.base_url}/app.bsky.feed.searchPosts"
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession(headers=self.auth_headers) as session:
+            return await asyncio.gather(*[
+                self._get_json_async(session, sem, url, {"q": term, "limit": limit}, "Search failed")
+                for term in search_terms
+            ])
     
-    def get_profile(self, actor):
-        """Get profile information for a user."""
-        url = f"{self.base_url}/app.bsky.actor.getProfile"
-        params = {"actor": actor}
-        
-        try:
-            response = requests.get(url, params=params, headers=self.get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Failed to get profile: {e}")
-            return None
+    async def _fetch_users(self, handles, limit):
+        """Fetch (profile, feed) pairs for every handle concurrently."""
+        profile_url = f"{self.base_url}/app.bsky.actor.getProfile"
+        feed_url = f"{self.base_url}/app.bsky.feed.getAuthorFeed"
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession(headers=self.auth_headers) as session:
+            async def fetch(handle):
+                return await asyncio.gather(
+                    self._get_json_async(session, sem, profile_url, {"actor": handle},
+                                         "Failed to get profile"),
+                    self._get_json_async(session, sem, feed_url, {"actor": handle, "limit": limit},
+                                         "Failed to get author feed"),
+                )
+            return await asyncio.gather(*[fetch(handle) for handle in handles])
     
     def analyze_moderation_labels(self, post):
-        """Extract moderation labels from a post."""
+        """Extract moderation labels from a post.
+        
+        Every label is a dict of str 'type', 'value' and 'created'; the analyzer relies on this.
+        """
         labels = []
         
         # Check for labels on the post itself
@@ -94,8 +124,8 @@ class BlueskyModerationCollector:
             for label in post['labels']:
                 labels.append({
                     'type': 'post',
-                    'value': label.get('val', 'unknown'),
-                    'created': label.get('cts', 'unknown')
+                    'value': str(label.get('val', 'unknown')),
+                    'created': str(label.get('cts', 'unknown'))
                 })
         
         # Check for labels on embedded content
@@ -103,19 +133,27 @@ class BlueskyModerationCollector:
             for label in post['embed']['labels']:
                 labels.append({
                     'type': 'embed',
-                    'value': label.get('val', 'unknown'),
-                    'created': label.get('cts', 'unknown')
+                    'value': str(label.get('val', 'unknown')),
+                    'created': str(label.get('cts', 'unknown'))
                 })
         
         return labels
     
     def collect_moderation_data(self, search_terms, output_file="moderation_data.csv"):
-        """Collect posts and analyze moderation patterns."""
-        all_data = []
+        """Collect posts and analyze moderation patterns.
+        
+        Returns a dict mapping each of POST_FIELDS to its column of values.
+        """
+        if not self.session:
+            raise Exception("Not authenticated")
+        
+        cols = {k: [] for k in POST_FIELDS}
         
-        for term in search_terms:
-            print(f"\n→ Searching for: '{term}'")
-            results = self.search_posts(term, limit=100)
+        print(f"\n→ Searching for: {', '.join(repr(t) for t in search_terms)}")
+        search_results = asyncio.run(self._search_all(search_terms, limit=100))
+        
+        for term, results in zip(search_terms, search_results):
+            print(f"\n→ Results for: '{term}'")
             
             if not results or 'posts' not in results:
                 print(f"  No results found")
@@ -132,50 +170,48 @@ class BlueskyModerationCollector:
                 labels = self.analyze_moderation_labels(post)
                 
                 # Compile data
-                data_point = {
-                    'timestamp': datetime.now().isoformat(),
-                    'search_term': term,
-                    'post_uri': post.get('uri', ''),
-                    'post_text': record.get('text', ''),
-                    'author_handle': author.get('handle', ''),
-                    'author_display_name': author.get('displayName', ''),
-                    'author_followers': author.get('followersCount', 0),
-                    'author_following': author.get('followsCount', 0),
-                    'author_posts': author.get('postsCount', 0),
-                    'likes_count': post.get('likeCount', 0),
-                    'repost_count': post.get('repostCount', 0),
-                    'reply_count': post.get('replyCount', 0),
-                    'has_moderation': len(labels) > 0,
-                    'moderation_labels': json.dumps(labels),
-                    'created_at': record.get('createdAt', '')
-                }
-                
-                all_data.append(data_point)
-            
-            # Rate limiting
-            time.sleep(2)
+                cols['timestamp'].append(datetime.now().isoformat())
+                cols['search_term'].append(term)
+                cols['post_uri'].append(post.get('uri', ''))
+                cols['post_text'].append(record.get('text', ''))
+                cols['author_handle'].append(author.get('handle', ''))
+                cols['author_display_name'].append(author.get('displayName', ''))
+                cols['author_followers'].append(author.get('followersCount', 0))
+                cols['author_following'].append(author.get('followsCount', 0))
+                cols['author_posts'].append(author.get('postsCount', 0))
+                cols['likes_count'].append(post.get('likeCount', 0))
+                cols['repost_count'].append(post.get('repostCount', 0))
+                cols['reply_count'].append(post.get('replyCount', 0))
+                cols['has_moderation'].append(len(labels) > 0)
+                cols['moderation_labels'].append(orjson.dumps(labels).decode())
+                cols['created_at'].append(record.get('createdAt', ''))
         
         # Save to CSV
-        if all_data:
-            self.save_to_csv(all_data, output_file)
-            print(f"\n✓ Saved {len(all_data)} posts to {output_file}")
+        n_posts = len(cols['post_uri'])
+        if n_posts:
+            self.save_to_csv(cols, output_file)
+            print(f"\n✓ Saved {n_posts} posts to {output_file}")
         
-        return all_data
+        return cols
     
     def analyze_user_activity(self, handles, output_file="user_analysis.csv"):
-        """Analyze moderation patterns across different user types."""
-        user_data = []
+        """Analyze moderation patterns across different user types.
+        
+        Returns a dict mapping each of USER_FIELDS to its column of values.
+        """
+        if not self.session:
+            raise Exception("Not authenticated")
         
-        for handle in handles:
+        cols = {k: [] for k in USER_FIELDS}
+        
+        user_results = asyncio.run(self._fetch_users(handles, limit=50))
+        
+        for handle, (profile, feed) in zip(handles, user_results):
             print(f"\n→ Analyzing user: {handle}")
             
-            # Get profile
-            profile = self.get_profile(handle)
             if not profile:
                 continue
             
-            # Get recent posts
-            feed = self.get_author_feed(handle, limit=50)
             if not feed or 'feed' not in feed:
                 continue
             
@@ -189,37 +225,33 @@ class BlueskyModerationCollector:
                     posts_with_labels += 1
                     total_labels.extend(labels)
             
-            user_data.append({
-                'handle': handle,
-                'display_name': profile.get('displayName', ''),
-                'followers': profile.get('followersCount', 0),
-                'following': profile.get('followsCount', 0),
-                'total_posts': profile.get('postsCount', 0),
-                'posts_analyzed': len(feed['feed']),
-                'posts_with_moderation': posts_with_labels,
-                'moderation_rate': posts_with_labels / len(feed['feed']) if feed['feed'] else 0,
-                'unique_labels': len(set([l['value'] for l in total_labels])),
-                'all_labels': json.dumps(total_labels)
-            })
-            
-            time.sleep(2)
+            cols['handle'].append(handle)
+            cols['display_name'].append(profile.get('displayName', ''))
+            cols['followers'].append(profile.get('followersCount', 0))
+            cols['following'].append(profile.get('followsCount', 0))
+            cols['total_posts'].append(profile.get('postsCount', 0))
+            cols['posts_analyzed'].append(len(feed['feed']))
+            cols['posts_with_moderation'].append(posts_with_labels)
+            cols['moderation_rate'].append(posts_with_labels / len(feed['feed']) if feed['feed'] else 0)
+            cols['unique_labels'].append(len(set([l['value'] for l in total_labels])))
+            cols['all_labels'].append(orjson.dumps(total_labels).decode())
         
-        if user_data:
-            self.save_to_csv(user_data, output_file)
-            print(f"\n✓ Saved analysis of {len(user_data)} users to {output_file}")
+        n_users = len(cols['handle'])
+        if n_users:
+            self.save_to_csv(cols, output_file)
+            print(f"\n✓ Saved analysis of {n_users} users to {output_file}")
         
-        return user_data
+        return cols
     
-    def save_to_csv(self, data, filename):
-        if not data:
+    def save_to_csv(self, cols, filename):
+        """Write a dict of equal-length columns to CSV, plus a Parquet twin next to it."""
+        if not cols:
             return
         
-        keys = data[0].keys()
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(data)
+        # Both files are written from one Arrow table by Arrow's C++ writers.
+        table = pa.Table.from_pydict(cols)
+        pacsv.write_csv(table, filename)
+        pq.write_table(table, os.path.splitext(filename)[0] + '.parquet', compression='zstd')
 
 
 def main():
@@ -249,11 +281,11 @@ def main():
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print(f"Total posts collected: {len(moderation_data)}")
-    print(f"Posts with moderation labels: {sum(1 for d in moderation_data if d['has_moderation'])}")
+    print(f"Total posts collected: {len(moderation_data['post_uri'])}")
+    print(f"Posts with moderation labels: {sum(moderation_data['has_moderation'])}")
     print("\nData saved to:")
-    print("  - moderation_data.csv")
-    print("  - user_analysis.csv")
+    print("  - moderation_data.csv / moderation_data.parquet")
+    print("  - user_analysis.csv / user_analysis.parquet")
 
 
 if __name__ == "__main__":
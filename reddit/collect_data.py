@@ -1,62 +1,120 @@
 import praw
-import pandas as pd
+import csv
 from datetime import datetime, timezone
 import time
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 from dotenv import load_dotenv
 from prawcore.exceptions import NotFound, Forbidden
 
-user_info_cache = {}
+# Each worker thread keeps its own praw.Reddit for the whole run (PRAW is not thread-safe);
+# request_pacer spaces their requests over the account's shared rate-limit budget.
+USER_INFO_WORKERS = 8
+
+POST_FIELDS = (
+    'post_fullname', 'created_utc', 'captured_at_utc', 'post_age_seconds_at_capture',
+    'subreddit', 'title', 'selftext', 'domain', 'initial_score', 'initial_num_comments',
+    'initial_upvote_ratio', 'link_flair_text', 'author_username', 'author_account_age_days',
+    'author_total_karma', 'author_link_karma', 'author_comment_karma', 'author_is_verified',
+    'author_unavailable'
+)
+
+UNAVAILABLE_USER_INFO = MappingProxyType({
+    'username': '[deleted]',
+    'account_age_days': None,
+    'link_karma': None,
+    'comment_karma': None,
+    'total_karma': None,
+    'is_verified': None,
+    'author_unavailable': True
+})
 
 load_dotenv()
 
-reddit = praw.Reddit(
-    client_id=os.getenv('REDDIT_CLIENT_ID'),
-    client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-    username=os.getenv('REDDIT_USERNAME'),
-    password=os.getenv('REDDIT_PASSWORD'),
-    user_agent='moderation_research_bot v1.0 by /u/' + os.getenv('REDDIT_USERNAME')
-)
+def make_reddit():
+    """Build an authenticated praw.Reddit from the environment"""
+    return praw.Reddit(
+        client_id=os.getenv('REDDIT_CLIENT_ID'),
+        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+        username=os.getenv('REDDIT_USERNAME'),
+        password=os.getenv('REDDIT_PASSWORD'),
+        user_agent='moderation_research_bot v1.0 by /u/' + os.getenv('REDDIT_USERNAME')
+    )
 
-print("✓ Connected to Reddit as:", reddit.user.me())
+reddit = make_reddit()
 
-def collect_user_info(author):
-    """Safely collect user demographic information with caching"""
-    if author is None:
-        return {
-            'username': '[deleted]',
-            'account_age_days': None,
-            'link_karma': None,
-            'comment_karma': None,
-            'total_karma': None,
-            'is_verified': None,
-            'author_unavailable': True
-        }
+_thread_local = threading.local()
+
+def get_reddit():
+    """Return this worker thread's praw.Reddit, building it on first use"""
+    if not hasattr(_thread_local, 'reddit'):
+        _thread_local.reddit = make_reddit()
+    return _thread_local.reddit
+
+class RequestPacer:
+    """
+    Spaces requests from every worker's praw.Reddit evenly over the budget that
+    Reddit's X-Ratelimit headers report for the account, which all clients share.
+    Each client's own prawcore limiter only sees its own requests, so on its own
+    it would let every worker burst at once when the budget is nearly spent.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.next_at = 0.0
+        self.remaining = None
+        self.reset_at = 0.0
+    
+    def wait(self):
+        """Block until this thread's turn to send a request."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            interval = 0.0
+            if self.remaining is not None and start < self.reset_at:
+                if self.remaining >= 1:
+                    interval = (self.reset_at - start) / self.remaining
+                    self.remaining -= 1
+                else:
+                    # Budget spent: hold until the window resets, then wait for fresh headers
+                    start = self.reset_at
+                    self.remaining = None
+            self.next_at = start + interval
+        time.sleep(start - now)
     
-    username = None
+    def update(self, limits):
+        """Record the budget from a client's `auth.limits` after one of its requests."""
+        if limits.get('remaining') is None or limits.get('reset_timestamp') is None:
+            return
+        with self._lock:
+            self.remaining = limits['remaining']
+            self.reset_at = time.monotonic() + (limits['reset_timestamp'] - time.time())
+
+request_pacer = RequestPacer()
+
+print("✓ Connected to Reddit as:", reddit.user.me())
 
+@lru_cache(maxsize=50_000)
+def _user_record(username):
+    """Fetch and cache demographic information for one username.
+    Missing, forbidden and suspended accounts are cached as unavailable; any other
+    (likely transient) error propagates so the lookup is not cached."""
+    client = get_reddit()
+    author = client.redditor(username)
+    request_pacer.wait()
     try:
-        username = str(author)
-        
-        if username == '[deleted]':
-            return {
-                'username': '[deleted]',
-                'account_age_days': None,
-                'link_karma': None,
-                'comment_karma': None,
-                'total_karma': None,
-                'is_verified': None,
-                'author_unavailable': True
-            }
-        
-        if username in user_info_cache:
-            return user_info_cache[username]
-        
-        if not hasattr(author, 'created_utc') or author.created_utc is None:
+        try:
+            # First attribute access fetches the profile
+            created_utc = getattr(author, 'created_utc', None)
+        finally:
+            request_pacer.update(client.auth.limits)
+        if created_utc is None:
             raise AttributeError("Account data unavailable (likely suspended)")
         
-        account_age_days = (datetime.now(timezone.utc) - datetime.fromtimestamp(author.created_utc, tz=timezone.utc)).days
+        account_age_days = (datetime.now(timezone.utc) - datetime.fromtimestamp(created_utc, tz=timezone.utc)).days
 
         user_data = {
             'username': username,
@@ -67,51 +125,46 @@ def collect_user_info(author):
             'is_verified': author.is_verified if hasattr(author, 'is_verified') else False,
             'author_unavailable': False
         }
-
-        time.sleep(0.6)
         
-        user_info_cache[username] = user_data
         return user_data
         
     except (NotFound, Forbidden, AttributeError) as e:  
         print(f"  (User {username} unavailable: {e}. Caching failure.)")
-        user_info_cache[username] = {
-            'username': username if username else '[error]',
-            'account_age_days': None,
-            'link_karma': None,
-            'comment_karma': None,
-            'total_karma': None,
-            'is_verified': None,
-            'author_unavailable': True
-        }
-        return user_info_cache[username]
+        return {**UNAVAILABLE_USER_INFO, 'username': username}
+
+def collect_user_info(author):
+    """Safely collect user demographic information with caching"""
+    if author is None:
+        return UNAVAILABLE_USER_INFO
+    
+    try:
+        username = str(author)
     except Exception as e:
-        print(f"  (Unexpected error collecting user {username}: {e}. Caching failure.)")
-        user_info_cache[username] = {
-            'username': '[error]',
-            'account_age_days': None,
-            'link_karma': None,
-            'comment_karma': None,
-            'total_karma': None,
-            'is_verified': None,
-            'author_unavailable': True
-        }
-        return user_info_cache[username]
+        print(f"  (Unexpected error reading author name: {e}.)")
+        return {**UNAVAILABLE_USER_INFO, 'username': '[error]'}
+    
+    if username == '[deleted]':
+        return UNAVAILABLE_USER_INFO
+    
+    try:
+        return _user_record(username)
+    except Exception as e:
+        print(f"  (Unexpected error collecting user {username}: {e}.)")
+        return {**UNAVAILABLE_USER_INFO, 'username': '[error]'}
 
-def collect_post_data(post):
-    """Collects the *initial* state of the post."""
+def collect_post_data(post, author_info, captured_at_utc):
+    """Collects the *initial* state of the post, given its author's collect_user_info result
+    and the cohort-wide capture time."""
     try:
-        author_info = collect_user_info(post.author)
         body = getattr(post, "selftext", None)
         created_dt = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
-        captured_at_utc = datetime.now(timezone.utc)
         
         return {
             'post_fullname': post.fullname, 
             
             'created_utc': created_dt,
             'captured_at_utc': captured_at_utc,
-            'post_age_seconds_at_capture': (captured_at_utc - created_dt).total_seconds(),
+            'post_age_seconds_at_capture': captured_at_utc.timestamp() - post.created_utc,
             
             'subreddit': str(post.subreddit),
             'title': post.title,
@@ -135,30 +188,44 @@ def collect_post_data(post):
         return None
 
 
-def collect_initial_cohort(subreddit_name, limit=100):
+def collect_initial_cohort(subreddit_name, writers, executor, limit=100):
     """
     PASS 1: Collect fresh posts from /new before moderation
-    Returns: DataFrame and list of post IDs
+    Each post's row is written to every csv.DictWriter in `writers` as soon as it is built.
+    Author lookups run on `executor`, which is shared across subreddits so its
+    workers keep their Reddit clients.
+    Returns: list of post IDs
     """
     print(f"\n📊 [PASS 1] Collecting fresh posts from r/{subreddit_name}...")
     
     subreddit = reddit.subreddit(subreddit_name)
-    posts_data = []
     post_fullnames = []
     
-    posts = subreddit.new(limit=limit)
+    posts = list(subreddit.new(limit=limit))
+    
+    author_infos = list(executor.map(collect_user_info, [post.author for post in posts]))
     
-    for i, post in enumerate(posts, 1):
+    captured_at_utc = datetime.now(timezone.utc)
+    
+    for i, (post, author_info) in enumerate(zip(posts, author_infos), 1):
         if i % 100 == 0:
             print(f"  Processed {i} posts...")
         
-        post_data = collect_post_data(post)
+        post_data = collect_post_data(post, author_info, captured_at_utc)
         if post_data:
-            posts_data.append(post_data)
+            for writer in writers:
+                writer.writerow(post_data)
             post_fullnames.append(post_data['post_fullname'])
             
-    print(f"✓ Collected {len(posts_data)} posts from r/{subreddit_name}")
-    return pd.DataFrame(posts_data), post_fullnames
+    print(f"✓ Collected {len(post_fullnames)} posts from r/{subreddit_name}")
+    return post_fullnames
+
+def open_csv_writer(filename):
+    """Open `filename` for streaming POST_FIELDS rows; returns (file, writer)."""
+    f = open(filename, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(f, fieldnames=POST_FIELDS)
+    writer.writeheader()
+    return f, writer
 
 if __name__ == "__main__":
     start_time = time.time()
@@ -174,34 +241,43 @@ if __name__ == "__main__":
         # 'technology'     
     ]
     
-    all_initial_data = []
+    total_posts = 0
     cohort_ids = {} 
     
-    for subreddit in subreddits:
-        try:
-            df, post_fullnames = collect_initial_cohort(subreddit, limit=100)
-            if df.empty:
-                print(f"  No data collected for r/{subreddit}. Skipping.")
+    os.makedirs('data/pass1', exist_ok=True)
+    combined_filename = f'data/combined_pass1_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
+    combined_file, combined_writer = open_csv_writer(combined_filename)
+    
+    with combined_file, ThreadPoolExecutor(max_workers=USER_INFO_WORKERS) as executor:
+        for subreddit in subreddits:
+            try:
+                filename = f'data/pass1/{subreddit}_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
+                post_fullnames = []
+                try:
+                    sub_file, sub_writer = open_csv_writer(filename)
+                    with sub_file:
+                        post_fullnames = collect_initial_cohort(
+                            subreddit, [combined_writer, sub_writer], executor, limit=100
+                        )
+                finally:
+                    # Skipped or failed subreddits leave no header-only file behind
+                    if not post_fullnames and os.path.exists(filename):
+                        os.remove(filename)
+                if not post_fullnames:
+                    print(f"  No data collected for r/{subreddit}. Skipping.")
+                    continue
+                total_posts += len(post_fullnames)
+                cohort_ids[subreddit] = post_fullnames
+                
+                print(f"💾 Saved to {filename}")
+                
+                time.sleep(5)
+                
+            except Exception as e:
+                print(f"❌ Error with r/{subreddit}: {e}")
                 continue
-            all_initial_data.append(df)
-            cohort_ids[subreddit] = post_fullnames
-            
-            os.makedirs('data/pass1', exist_ok=True)
-            filename = f'data/pass1/{subreddit}_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
-            df.to_csv(filename, index=False)
-            print(f"💾 Saved to {filename}")
-            
-            time.sleep(5)
-            
-        except Exception as e:
-            print(f"❌ Error with r/{subreddit}: {e}")
-            continue
     
-    if all_initial_data:
-        combined_df = pd.concat(all_initial_data, ignore_index=True)
-        combined_filename = f'data/combined_pass1_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
-        combined_df.to_csv(combined_filename, index=False)
-
+    if total_posts:
         cohort_filename = f'data/cohort_ids_{datetime.now().strftime("%Y%m%d_%H%M")}.json'
         with open(cohort_filename, 'w') as f:
             json.dump(cohort_ids, f, indent=2)
@@ -210,8 +286,10 @@ if __name__ == "__main__":
         end_time = time.time()
         
         print(f"\n✅ PASS 1 COMPLETE")
-        print(f"Total posts collected: {len(combined_df)}")
+        print(f"Total posts collected: {total_posts}")
+        print(f"User info cache: {_user_record.cache_info()}")
         print(f"Cohort IDs saved to: {cohort_filename}")
         print(f"Total time taken: {((end_time - start_time) / 60):.2f} minutes")
     else:
+        os.remove(combined_filename)
         print("\n❌ No data collected")
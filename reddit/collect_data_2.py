@@ -1,11 +1,19 @@
+import asyncio
+import httpx
 import praw
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime, timezone
 import time
 import os
-import json
+import orjson
 from dotenv import load_dotenv
-import glob
+import threading
+import shelve
+import shutil
+import sys
 
 load_dotenv()
 reddit = praw.Reddit(
@@ -17,134 +25,470 @@ reddit = praw.Reddit(
 )
 print("✓ Connected to Reddit as:", reddit.user.me())
 
-def get_final_post_status(post_fullnames):
+REDDIT_TOKEN_URL = 'https://www.reddit.com/api/v1/access_token'
+REDDIT_INFO_URL = 'https://oauth.reddit.com/api/info'
+TOKEN_EXPIRY_MARGIN = 60
+REQUEST_TIMEOUT = 30
+PASS1_INDEX = 'data/pass1.parquet'
+STATUS_CACHE_DIR = 'data/status_cache'
+
+# Column types of the Pass 1 CSVs (POST_FIELDS in collect_data.py), so every file parses the same way
+PASS1_SCHEMA = pa.schema([
+    ('post_fullname', pa.string()),
+    ('created_utc', pa.timestamp('us', tz='UTC')),
+    ('captured_at_utc', pa.timestamp('us', tz='UTC')),
+    ('post_age_seconds_at_capture', pa.float64()),
+    ('subreddit', pa.string()),
+    ('title', pa.string()),
+    ('selftext', pa.string()),
+    ('domain', pa.string()),
+    ('initial_score', pa.int64()),
+    ('initial_num_comments', pa.int64()),
+    ('initial_upvote_ratio', pa.float64()),
+    ('link_flair_text', pa.string()),
+    ('author_username', pa.string()),
+    ('author_account_age_days', pa.int64()),
+    ('author_total_karma', pa.int64()),
+    ('author_link_karma', pa.int64()),
+    ('author_comment_karma', pa.int64()),
+    ('author_is_verified', pa.bool_()),
+    ('author_unavailable', pa.bool_()),
+])
+BATCH_SIZE = 100
+MAX_CONCURRENT_BATCHES = 16
+MAX_CONCURRENT_WRITES = 4
+MAX_RETRIES = 5
+RATE_LIMIT_THRESHOLD = 5
+
+class AccessToken:
+    """
+    Password-grant OAuth token for the direct /api/info calls, fetched once
+    and reused until TOKEN_EXPIRY_MARGIN seconds before it expires.
+    """
+    def __init__(self):
+        self.value = None
+        self.expires_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def get(self, client):
+        async with self._lock:
+            if self.value is None or time.monotonic() >= self.expires_at:
+                response = await client.post(
+                    REDDIT_TOKEN_URL,
+                    auth=(os.getenv('REDDIT_CLIENT_ID'), os.getenv('REDDIT_CLIENT_SECRET')),
+                    data={
+                        'grant_type': 'password',
+                        'username': os.getenv('REDDIT_USERNAME'),
+                        'password': os.getenv('REDDIT_PASSWORD'),
+                    }
+                )
+                response.raise_for_status()
+                payload = response.json()
+                self.value = payload['access_token']
+                self.expires_at = time.monotonic() + payload['expires_in'] - TOKEN_EXPIRY_MARGIN
+        return self.value
+    
+    def invalidate(self, token):
+        """Drop `token` after Reddit rejected it, unless another request already replaced it."""
+        if self.value == token:
+            self.value = None
+
+access_token = AccessToken()
+
+class RateLimiter:
+    """
+    Bounds concurrent requests and, when Reddit's X-Ratelimit-Remaining drops
+    below RATE_LIMIT_THRESHOLD, holds new requests until X-Ratelimit-Reset.
+    """
+    def __init__(self, max_concurrent):
+        self.sem = asyncio.Semaphore(max_concurrent)
+        self.remaining = None
+        self.reset_at = 0.0
+    
+    def update(self, headers):
+        """Record the budget reported by a response's rate-limit headers."""
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-Ratelimit-Reset')
+        if remaining is not None and reset is not None:
+            self.remaining = float(remaining)
+            self.reset_at = time.monotonic() + float(reset)
+    
+    async def __aenter__(self):
+        await self.sem.acquire()
+        if self.remaining is not None and self.remaining < RATE_LIMIT_THRESHOLD:
+            delay = self.reset_at - time.monotonic()
+            if delay > 0:
+                print(f"    Rate limit nearly spent; waiting {delay:.0f}s for reset...")
+                await asyncio.sleep(delay)
+            self.remaining = None
+        elif self.remaining is not None:
+            # Count requests in flight against the budget until the next response updates it
+            self.remaining -= 1
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.sem.release()
+
+RAW_STATUS_FIELDS = (
+    'name', 'score', 'num_comments', 'upvote_ratio', 'selftext', 'title',
+    'removed_by_category', 'author', 'is_robot_indexable', 'locked', 'archived'
+)
+STATUS_FIELDS = RAW_STATUS_FIELDS + ('rechecked_at_utc',)
+
+STATUS_DTYPES = {
+    'final_score': 'Int32',
+    'final_num_comments': 'Int32',
+    'final_upvote_ratio': 'float32',
+    'is_removed_official': 'bool',
+    'is_removed_content': 'bool',
+    'is_removed_inferred': 'bool',
+    'removed_by_category': 'category',
+    'is_deleted': 'bool',
+    'is_deleted_author': 'bool',
+    'is_deleted_content': 'bool',
+    'is_locked': 'bool',
+    'is_archived': 'bool',
+    'rechecked_at_utc': 'datetime64[ns, UTC]',
+}
+# Left-joining Pass 1 rows without a status leaves gaps, so the flags become nullable
+MERGED_STATUS_DTYPES = {
+    column: 'boolean' if dtype == 'bool' else dtype
+    for column, dtype in STATUS_DTYPES.items()
+}
+
+# Arrow types of the status columns in the combined file, fixed up front rather than
+# inferred from whichever subreddit is written first (which may have no statuses at all)
+STATUS_SCHEMA = pa.schema([
+    ('final_score', pa.int32()),
+    ('final_num_comments', pa.int32()),
+    ('final_upvote_ratio', pa.float32()),
+    ('is_removed_official', pa.bool_()),
+    ('is_removed_content', pa.bool_()),
+    ('is_removed_inferred', pa.bool_()),
+    ('removed_by_category', pa.dictionary(pa.int32(), pa.string())),
+    ('is_deleted', pa.bool_()),
+    ('is_deleted_author', pa.bool_()),
+    ('is_deleted_content', pa.bool_()),
+    ('is_locked', pa.bool_()),
+    ('is_archived', pa.bool_()),
+    ('rechecked_at_utc', pa.timestamp('ns', tz='UTC')),
+])
+COMBINED_SCHEMA = pa.schema(list(PASS1_SCHEMA) + list(STATUS_SCHEMA))
+
+def build_status_df(status_cols):
+    """Derive the final-status columns for every post at once from the raw /api/info fields."""
+    raw = pd.DataFrame(status_cols)
+    
+    is_removed_official = raw['removed_by_category'].notna()
+    is_removed_content = (raw['selftext'] == '[removed]') | (raw['title'] == '[removed]')
+    is_deleted_content = raw['selftext'] == '[deleted]'
+    is_deleted_author = raw['author'].isna() | (raw['author'] == '[deleted]')
+    
+    return pd.DataFrame({
+        'post_fullname': raw['name'],
+        'final_score': raw['score'],
+        'final_num_comments': raw['num_comments'],
+        'final_upvote_ratio': raw['upvote_ratio'],
+        'is_removed_official': is_removed_official,
+        'is_removed_content': is_removed_content,
+        'is_removed_inferred': is_removed_official | is_removed_content | (raw['is_robot_indexable'] == False),
+        # Go through the nullable string dtype so missing values stay missing and the
+        # categories stay strings even when there are no rows
+        'removed_by_category': raw['removed_by_category'].astype('string'),
+        'is_deleted': is_deleted_author | is_deleted_content,
+        'is_deleted_author': is_deleted_author,
+        'is_deleted_content': is_deleted_content,
+        'is_locked': raw['locked'],
+        'is_archived': raw['archived'],
+        'rechecked_at_utc': raw['rechecked_at_utc']
+    }).astype(STATUS_DTYPES)
+
+async def fetch_batch(client, limiter, batch_ids):
+    """
+    Fetch raw post JSON for up to 100 fullnames from /api/info.
+    Retries with exponential backoff (or Retry-After) on 429, and once with a
+    fresh token on 401.
+    """
+    refreshed_token = False
+    for attempt in range(MAX_RETRIES):
+        token = await access_token.get(client)
+        async with limiter:
+            response = await client.get(
+                REDDIT_INFO_URL,
+                params={'id': ','.join(batch_ids), 'raw_json': 1},
+                headers={'Authorization': f"bearer {token}"}
+            )
+            limiter.update(response.headers)
+        if response.status_code == 401 and not refreshed_token:
+            access_token.invalidate(token)
+            refreshed_token = True
+            continue
+        if response.status_code == 429:
+            retry_after = float(response.headers.get('Retry-After', 2 ** attempt))
+        else:
+            response.raise_for_status()
+            payload = response.json()
+            return [child['data'] for child in payload['data']['children']]
+        # Back off outside the limiter so the wait doesn't hold a concurrency slot
+        await asyncio.sleep(retry_after)
+    raise RuntimeError(f"still rate limited after {MAX_RETRIES} attempts")
+
+async def get_final_post_status(client, limiter, post_fullnames, cache):
     """
     Takes a list of post fullnames (e.g., ['t3_abc', 't3_def'])
-    and returns a dictionary of their final status.
-    This is 100x faster than checking one by one.
+    and returns their raw status fields as a dict of column lists (see STATUS_FIELDS).
+    Duplicate fullnames are checked once, and posts already in `cache` from an
+    interrupted run of this cohort are not re-fetched. The remaining 100-id batches
+    are fetched concurrently, paced by `limiter`, and added to `cache`.
+    Also returns whether every batch succeeded.
     """
-    print(f"  Fetching final status for {len(post_fullnames)} posts in batches...")
-    status_map = {}
+    status_cols = {field: [] for field in STATUS_FIELDS}
+    todo = []
+    for fullname in dict.fromkeys(post_fullnames):
+        row = cache.get(fullname)
+        if row is None:
+            todo.append(fullname)
+        else:
+            for field, value in zip(STATUS_FIELDS, row):
+                status_cols[field].append(value)
     
-    for i in range(0, len(post_fullnames), 100):
-        batch_ids = post_fullnames[i:i+100]
-        
+    print(f"  Fetching final status for {len(todo)} posts in batches ({len(status_cols['name'])} cached)...")
+    batches = [todo[i:i+BATCH_SIZE] for i in range(0, len(todo), BATCH_SIZE)]
+    results = await asyncio.gather(
+        *[fetch_batch(client, limiter, batch_ids) for batch_ids in batches],
+        return_exceptions=True
+    )
+    
+    complete = True
+    for i, result in zip(range(0, len(todo), BATCH_SIZE), results):
+        if isinstance(result, Exception):
+            print(f"    Error in batch {i}-{i+BATCH_SIZE}: {result}")
+            complete = False
+            continue
+        rechecked_at_utc = datetime.now(timezone.utc)
+        for data in result:
+            row = tuple(data.get(field) for field in RAW_STATUS_FIELDS) + (rechecked_at_utc,)
+            cache[data['name']] = row
+            for field, value in zip(STATUS_FIELDS, row):
+                status_cols[field].append(value)
+
+    print(f"  ✓ Found status for {len(status_cols['name'])} posts.")
+    return status_cols, complete
+
+class CombinedParquetWriter:
+    """
+    Appends each subreddit's joined frame to one Parquet file as it completes,
+    so the combined output never has to be held in memory at once.
+    Every frame is converted to `schema`, so all row groups share one schema.
+    """
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.writer = None
+        self.rows = 0
+        self._lock = threading.Lock()
+    
+    def write(self, df):
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        with self._lock:
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, self.schema, compression='snappy')
+            self.writer.write_table(table)
+            self.rows += table.num_rows
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def index_pass1(pass1_files):
+    """
+    Parse every subreddit's latest Pass 1 CSV once, as PASS1_SCHEMA, and write
+    them to one subreddit-partitioned Parquet dataset at PASS1_INDEX.
+    A file that fails to parse only drops its own subreddit.
+    Returns the {subreddit: path} entries that were indexed.
+    """
+    convert_options = pacsv.ConvertOptions(
+        column_types=PASS1_SCHEMA,
+        include_columns=PASS1_SCHEMA.names,
+        include_missing_columns=True,
+        strings_can_be_null=True
+    )
+    indexed = {}
+    tables = []
+    for subreddit, path in pass1_files.items():
+        print(f"  Indexing Pass 1 data from: {path}")
         try:
-            for post in reddit.info(fullnames=batch_ids):
-                body = getattr(post, "selftext", None)
-                
-                is_removed_official = post.removed_by_category is not None
-                is_removed_content = (body == '[removed]') or (post.title == '[removed]')
-                is_deleted_content = (body == '[deleted]')
-                is_deleted_author = post.author is None or str(post.author) == '[deleted]'
-                
-                is_deleted = is_deleted_author or is_deleted_content
-                is_removed_inferred = (
-                    is_removed_official
-                    or is_removed_content
-                    or (hasattr(post, 'is_robot_indexable') and post.is_robot_indexable is False)
-                )
-                
-                status_map[post.fullname] = {
-                    'final_score': post.score,
-                    'final_num_comments': post.num_comments,
-                    'final_upvote_ratio': post.upvote_ratio,
-                    'is_removed_official': is_removed_official,
-                    'is_removed_content': is_removed_content,
-                    'is_removed_inferred': is_removed_inferred,
-                    'removed_by_category': post.removed_by_category,
-                    'is_deleted': is_deleted,
-                    'is_deleted_author': is_deleted_author,
-                    'is_deleted_content': is_deleted_content,
-                    'is_locked': post.locked,
-                    'is_archived': post.archived,
-                    'rechecked_at_utc': datetime.now(timezone.utc) 
-                }
-
-            if i + 100 < len(post_fullnames):  
-                time.sleep(2)
-
-        except Exception as e:
-            print(f"    Error in batch {i}-{i+100}: {e}")
-
-    print(f"  ✓ Found status for {len(status_map)} posts.")
-    return status_map
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                convert_options=convert_options
+            )
+        except (pa.ArrowInvalid, OSError) as e:
+            print(f"  ❌ Could not parse Pass 1 data for r/{subreddit}: {e}")
+            continue
+        # Partition on the cohort key so the per-subreddit filter always matches it
+        table = table.set_column(
+            table.schema.get_field_index('subreddit'), 'subreddit',
+            pa.array([subreddit] * table.num_rows, pa.string())
+        )
+        indexed[subreddit] = path
+        tables.append(table)
+    if not tables:
+        return indexed
+    table = pa.concat_tables(tables)
+    pq.write_to_dataset(
+        table, PASS1_INDEX,
+        partition_cols=['subreddit'],
+        existing_data_behavior='delete_matching'
+    )
+    return indexed
+
+def join_and_save(subreddit, status_data, combined):
+    """Join a subreddit's Pass 1 data with its final status, save it, and append it to the combined file."""
+    print(f"  Loading initial data from: {PASS1_INDEX} (subreddit={subreddit})")
+    df = pq.read_table(
+        PASS1_INDEX,
+        filters=[('subreddit', '=', subreddit)],
+        schema=PASS1_SCHEMA
+    ).to_pandas(types_mapper=pd.ArrowDtype)
+    
+    status_df = build_status_df(status_data)
+    
+    final_df = df.merge(status_df, on='post_fullname', how='left', validate='one_to_one').astype(MERGED_STATUS_DTYPES)
+    
+    new_filename = f"{subreddit}_complete_{datetime.now().strftime('%Y%m%d_%H%M')}.parquet"
+    new_filepath = os.path.join('data/pass2_complete', new_filename)
+    final_df.to_parquet(new_filepath, engine='pyarrow', compression='snappy', index=False)
+    
+    print(f"  💾 Saved final data to {new_filepath}")
+    combined.write(final_df)
+
+def latest(directory, prefix, suffix):
+    """Return the path of the most recently modified `prefix*suffix` file in `directory`, or None."""
+    best = None
+    best_mtime = -1
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return None
+    with entries:
+        for entry in entries:
+            if entry.name.startswith(prefix) and entry.name.endswith(suffix):
+                mtime = entry.stat().st_mtime_ns
+                if mtime > best_mtime:
+                    best_mtime = mtime
+                    best = entry.path
+    return best
+
+async def process_subreddit(client, limiter, write_slots, subreddit, post_fullnames, pass1_files, cache, combined):
+    """
+    Fetch one subreddit's final statuses, then join and save them off the event loop
+    so the write overlaps other subreddits' fetches. `write_slots` bounds how many
+    joined frames are being written (and held in memory) at once.
+    Returns False if any of its statuses could not be fetched or saved.
+    """
+    print(f"\nProcessing r/{subreddit}...")
+    
+    try:
+        if not post_fullnames:
+            print(f"  SKIPPING: No post IDs found for r/{subreddit}.")
+            return True
+            
+        if subreddit not in pass1_files:
+            print(f"  SKIPPING: No Pass 1 data file found for r/{subreddit}.")
+            return True
+        
+        status_data, complete = await get_final_post_status(client, limiter, post_fullnames, cache)
+        
+        async with write_slots:
+            await asyncio.to_thread(join_and_save, subreddit, status_data, combined)
+        return complete
+        
+    except Exception as e:
+        print(f"  ❌ Failed to process 'r/{subreddit}': {e}")
+        return False
+
+async def process_all(cohort_ids_by_sub, pass1_files, cache, combined):
+    """
+    Process every subreddit concurrently over one persistent HTTP/2 client, appending each to `combined`.
+    Returns whether every subreddit completed.
+    """
+    limiter = RateLimiter(MAX_CONCURRENT_BATCHES)
+    write_slots = asyncio.Semaphore(MAX_CONCURRENT_WRITES)
+    async with httpx.AsyncClient(
+        http2=True,
+        headers={'User-Agent': reddit.config.user_agent},
+        timeout=REQUEST_TIMEOUT
+    ) as client:
+        results = await asyncio.gather(*[
+            process_subreddit(client, limiter, write_slots, subreddit, post_fullnames, pass1_files, cache, combined)
+            for subreddit, post_fullnames in cohort_ids_by_sub.items()
+        ])
+    return all(results)
 
 
 if __name__ == "__main__":
     
    
-    id_files = glob.glob("data/cohort_ids_*.json")
-    if not id_files:
+    latest_id_file = latest('data', 'cohort_ids_', '.json')
+    if latest_id_file is None:
         print("❌ No 'cohort_ids_*.json' file found in 'data/'.")
         print("Run '1_collect_pending_posts.py' first.")
         exit()
         
-    latest_id_file = max(id_files, key=os.path.getctime)
     print(f"Found cohort ID file: {latest_id_file}")
     
-    with open(latest_id_file, 'r') as f:
-        cohort_ids_by_sub = json.load(f)
+    with open(latest_id_file, 'rb') as f:
+        cohort_ids_by_sub = orjson.loads(f.read())
 
     print(f"Found {len(cohort_ids_by_sub)} subreddits to check...")
     os.makedirs('data/pass2_complete', exist_ok=True)
     
-    all_final_data = []
-
-    for subreddit, post_fullnames in cohort_ids_by_sub.items():
-        print(f"\nProcessing r/{subreddit}...")
-        
-        try:
-            if not post_fullnames:
-                print(f"  SKIPPING: No post IDs found for r/{subreddit}.")
-                continue
-                
-            pass1_files = glob.glob(f"data/pass1/{subreddit}_*.csv")
-            if not pass1_files:
-                print(f"  SKIPPING: No Pass 1 data file found for r/{subreddit}.")
-                continue
-                
-            latest_pass1_file = max(pass1_files, key=os.path.getctime)
-            print(f"  Loading initial data from: {latest_pass1_file}")
-            df = pd.read_csv(latest_pass1_file)
-            
-            status_data = get_final_post_status(post_fullnames)
-            
-            status_df = pd.DataFrame.from_dict(status_data, orient='index')
-            status_df.index.name = 'post_fullname'
-            
-            
-            final_df = df.set_index('post_fullname').join(status_df)
-            final_df.reset_index(inplace=True) 
-            
-            new_filename = f"{subreddit}_complete_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
-            new_filepath = os.path.join('data/pass2_complete', new_filename)
-            final_df.to_csv(new_filepath, index=False)
-            
-            print(f"  💾 Saved final data to {new_filepath}")
-            all_final_data.append(final_df)
-            
-        except Exception as e:
-            print(f"  ❌ Failed to process 'r/{subreddit}': {e}")
+    pass1_files = {}
+    for subreddit in cohort_ids_by_sub:
+        latest_pass1_file = latest('data/pass1', f"{subreddit}_", '.csv')
+        if latest_pass1_file is not None:
+            pass1_files[subreddit] = latest_pass1_file
+    pass1_files = index_pass1(pass1_files)
+    
+    combined_path = f'data/combined_complete_{datetime.now().strftime("%Y%m%d_%H%M")}.parquet'
+    combined = CombinedParquetWriter(combined_path, COMBINED_SCHEMA)
+    # The status cache only lets an interrupted run resume; a complete run deletes it,
+    # so the next run re-checks every post. Pass --refresh to ignore a leftover cache.
+    cache_dir = os.path.join(STATUS_CACHE_DIR, os.path.splitext(os.path.basename(latest_id_file))[0])
+    os.makedirs(cache_dir, exist_ok=True)
+    complete = False
+    try:
+        with shelve.open(os.path.join(cache_dir, 'statuses'), flag='n' if '--refresh' in sys.argv else 'c') as cache:
+            if len(cache):
+                print(f"Resuming an interrupted run: {len(cache)} statuses already cached (pass --refresh to re-check them)")
+            complete = asyncio.run(process_all(cohort_ids_by_sub, pass1_files, cache, combined))
+    finally:
+        combined.close()
+    if complete:
+        shutil.rmtree(cache_dir)
+    else:
+        print(f"\n⚠️  Some statuses could not be fetched; kept {cache_dir} so a re-run only fetches the rest.")
             
-    if all_final_data:
-        print("\nCombining all processed data...")
-        combined_df = pd.concat(all_final_data, ignore_index=True)
-        combined_filename = f'data/combined_complete_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
-        combined_df.to_csv(combined_filename, index=False)
-        print(f"  💾 Saved combined data to {combined_filename}")
+    if combined.rows:
+        print(f"\n  💾 Saved combined data to {combined_path}")
         
         print("\n✅ FINAL CHECK COMPLETE")
-        print(f"Total posts processed: {len(combined_df)}")
+        print(f"Total posts processed: {combined.rows}")
         
         print(f"\nQuick stats (from combined data):")
-        if 'is_removed_official' in combined_df.columns:
-            print(f"  Official removal rate: {combined_df['is_removed_official'].mean()*100:.1f}%")
-            print(f"  Inferred removal rate: {combined_df['is_removed_inferred'].mean()*100:.1f}%")
-            print(f"  Locked rate: {combined_df['is_locked'].mean()*100:.1f}%")
-            print(f"  Subreddits: {combined_df['subreddit'].nunique()}")
+        stats_columns = ['is_removed_official', 'is_removed_inferred', 'is_locked', 'subreddit']
+        stats_df = None
+        if set(stats_columns) <= set(combined.writer.schema.names):
+            stats_df = pq.read_table(combined_path, columns=stats_columns).to_pandas(
+                types_mapper={pa.bool_(): pd.BooleanDtype()}.get
+            )
+        if stats_df is not None and stats_df['is_removed_official'].notna().any():
+            print(f"  Official removal rate: {stats_df['is_removed_official'].mean()*100:.1f}%")
+            print(f"  Inferred removal rate: {stats_df['is_removed_inferred'].mean()*100:.1f}%")
+            print(f"  Locked rate: {stats_df['is_locked'].mean()*100:.1f}%")
+            print(f"  Subreddits: {stats_df['subreddit'].nunique()}")
         else:
             print("  Could not calculate stats. Check for missing columns (e.g., 'is_removed_official').")
     else:
         print("\n❌ No data was processed.")
-